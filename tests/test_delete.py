@@ -0,0 +1,30 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import main  # noqa: E402
+
+
+@unittest.skipUnless(main.uring_unlink_supported(), "needs liburing and IORING_OP_UNLINKAT")
+class DeleteFilesUringTest(unittest.TestCase):
+    def test_deletes_non_utf8_name(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bad = os.path.join(os.fsencode(tmp), b"bad\xff.m3u")
+            good = os.path.join(tmp, "good.nfo")
+            for path in (bad, good):
+                with open(path, "wb"):
+                    pass
+
+            # scandir hands main() the undecodable byte as a lone surrogate
+            deleted, failed = main.delete_files([os.fsdecode(bad), good])
+
+            self.assertEqual((deleted, failed), (2, 0))
+            self.assertEqual(os.listdir(tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()